@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-from datetime import datetime
+import json
 import os
+import re
 
 class AttendanceSystem:
     """
@@ -19,6 +19,7 @@ class AttendanceSystem:
     WINDOW_HEIGHT = 800
     TILE_WIDTH = 200
     TILE_HEIGHT = 80
+    TILE_PADDING = 10
     
     # Colors
     COLORS = {
@@ -30,6 +31,13 @@ class AttendanceSystem:
         'text_light': '#000000',
         'save_button': '#27AE60'
     }
+    
+    # Bind tag shared by buttons with the press animation
+    ANIMATED_TAG = "AnimatedButton"
+    
+    # Column header patterns used for automatic column detection
+    ROLL_RE = re.compile(r"roll|enrollment|id|number")
+    NAME_RE = re.compile(r"name|student")
 
     def __init__(self):
         """Initialize the attendance system and set up the main window."""
@@ -43,12 +51,18 @@ class AttendanceSystem:
         self.root.title("Class Attendance")
         self.root.geometry(f"{self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}")
         self.root.resizable(False, True)
+        
+        # One shared binding for every animated button instead of per-widget binds
+        self.root.bind_class(self.ANIMATED_TAG, "<ButtonPress-1>", self.animate_press)
+        self.root.bind_class(self.ANIMATED_TAG, "<ButtonRelease-1>", self.animate_release)
 
     def initialize_data_structures(self):
         """Initialize data storage dictionaries."""
         self.classes_data = {}        # Stores class information and Excel data
-        self.attendance_records = {}   # Stores daily attendance records
-        self.student_buttons = {}      # Stores references to student buttons
+        self.attendance_records = {}   # Stores daily attendance as a bool array per class
+        self.tile_rects = []           # Canvas rectangle of each drawn tile, by row position
+        self.attendance_window = None  # Reused attendance window, hidden when closed
+        self.current_class = None      # Class shown in the attendance window
 
     def create_main_screen(self):
         """Create the main screen with class list."""
@@ -68,8 +82,7 @@ class AttendanceSystem:
             fg=self.COLORS['text_dark']
         )
         add_btn.pack(fill=tk.X)
-        add_btn.bind("<ButtonPress-1>", self.animate_press)
-        add_btn.bind("<ButtonRelease-1>", self.animate_release)
+        self.add_press_animation(add_btn)
         
         # Scrollable class list (upper area)
         self.classes_frame = tk.Frame(self.root)
@@ -83,17 +96,13 @@ class AttendanceSystem:
             
         try:
             # Load and process Excel file
-            df = pd.read_excel(file_path)
+            df, roll_col, name_col = self.load_class_dataframe(file_path)
             if "Total" not in df.columns:
                 df["Total"] = 0
             class_name = os.path.basename(file_path).split('.')[0]
             
-            # Detect data columns
-            roll_col, name_col = self.detect_data_columns(df)
-            
             # Reorder columns so that "Total" is always before the date columns
-            other_columns = [col for col in df.columns if col not in [roll_col, name_col, "Total"]]
-            df = df[[roll_col, name_col, "Total"] + other_columns]
+            self.order_columns(df, roll_col, name_col)
             
             # Store class data
             self.classes_data[class_name] = {
@@ -108,26 +117,80 @@ class AttendanceSystem:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load class: {str(e)}")
 
+    def load_class_dataframe(self, file_path):
+        """
+        Load class data, reusing the Feather cache next to the Excel file
+        while the workbook's size and modification time are unchanged.
+        Returns: (dataframe, roll_column, name_column)
+        """
+        import pandas as pd  # Deferred so startup only pays for tkinter
+        
+        cache_path = file_path + ".feather"
+        columns_path = cache_path + ".json"
+        stat = os.stat(file_path)
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        
+        try:
+            with open(columns_path) as f:
+                columns = json.load(f)
+            if columns['source'] == source:
+                df = pd.read_feather(cache_path)
+                if columns['roll_column'] in df.columns and columns['name_column'] in df.columns:
+                    return df, columns['roll_column'], columns['name_column']
+        except Exception:
+            pass  # Missing or unreadable cache, rebuild it from the workbook
+        
+        # Release the workbook as soon as the first sheet is parsed
+        with self.open_excel_file(file_path) as excel_file:
+            df = excel_file.parse(excel_file.sheet_names[0])
+        roll_col, name_col = self.detect_data_columns(df)
+        
+        # Caching is best effort (Feather needs pyarrow and string column names)
+        try:
+            df.to_feather(cache_path)
+            with open(columns_path, "w") as f:
+                json.dump({'source': source, 'roll_column': roll_col, 'name_column': name_col}, f)
+        except Exception:
+            pass
+        
+        return df, roll_col, name_col
+
+    def open_excel_file(self, file_path):
+        """
+        Open an Excel file, preferring the Rust-based calamine engine.
+        Falls back to pandas' default engine if calamine is unavailable.
+        """
+        import pandas as pd
+        
+        try:
+            return pd.ExcelFile(file_path, engine="calamine")
+        except (ImportError, ValueError):
+            return pd.ExcelFile(file_path)
+
     def detect_data_columns(self, df):
         """
         Detect roll number and name columns in Excel file.
         Returns: (roll_column, name_column)
         """
-        roll_patterns = ['roll', 'enrollment', 'id', 'number']
-        name_patterns = ['name', 'student']
+        import numpy as np
         
-        roll_col = name_col = None
+        cols_lower = df.columns.astype(str).str.lower()
+        roll_matches = np.flatnonzero(cols_lower.str.contains(self.ROLL_RE))
+        name_matches = np.flatnonzero(cols_lower.str.contains(self.NAME_RE))
         
-        # Search through column names
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if not roll_col and any(pattern in col_lower for pattern in roll_patterns):
-                roll_col = col
-            elif not name_col and any(pattern in col_lower for pattern in name_patterns):
-                name_col = col
+        # First roll match wins; the name column is the first other name match
+        roll_idx = roll_matches[0] if len(roll_matches) else None
+        name_idx = next((i for i in name_matches if i != roll_idx), None)
         
         # Default to first two columns if not found
-        return roll_col or df.columns[0], name_col or df.columns[1]
+        roll_col = df.columns[roll_idx] if roll_idx is not None else df.columns[0]
+        name_col = df.columns[name_idx] if name_idx is not None else df.columns[1]
+        return roll_col, name_col
+
+    def order_columns(self, df, roll_col, name_col):
+        """Move the roll, name and "Total" columns to the front in place."""
+        for position, col in enumerate([roll_col, name_col, "Total"]):
+            df.insert(position, col, df.pop(col))
 
     def create_class_tile(self, class_name):
         """Create a class tile with alternating colors."""
@@ -147,27 +210,68 @@ class AttendanceSystem:
             command=lambda: self.open_attendance_screen(class_name)
         )
         tile.pack(fill=tk.X, pady=5)
-        tile.bind("<ButtonPress-1>", self.animate_press)
-        tile.bind("<ButtonRelease-1>", self.animate_release)
+        self.add_press_animation(tile)
 
     def open_attendance_screen(self, class_name):
         """Open attendance screen for a class."""
-        # Create attendance window
+        # The window is built once and reused; only its tiles are redrawn
+        if self.attendance_window is None:
+            self.create_attendance_window()
+        else:
+            if self.attendance_window.state() != "withdrawn":
+                # Keep the class already on screen if it is the one requested
+                # or the user cancels leaving its unsaved marks
+                if class_name == self.current_class or not self.confirm_switch_class(class_name):
+                    self.attendance_window.deiconify()
+                    self.attendance_window.lift()
+                    return
+            self.clear_student_tiles()
+        
+        self.current_class = class_name
+        self.attendance_window.title(class_name)
+        
+        # Student grid drawn on the window's canvas while it is hidden, then
+        # laid out in one pass before being shown
+        self.create_student_grid(class_name)
+        self.attendance_window.update_idletasks()
+        self.attendance_window.deiconify()
+
+    def confirm_switch_class(self, class_name):
+        """
+        Ask whether to save the shown class's marks before opening another class.
+        Returns: True if the window may switch to the new class
+        """
+        if not self.attendance_records[self.current_class].any():
+            return True
+        
+        answer = messagebox.askyesnocancel(
+            "Unsaved Attendance",
+            f"Save attendance for {self.current_class} before opening {class_name}?"
+        )
+        if answer is None:
+            return False
+        return self.save_attendance(self.current_class) if answer else True
+
+    def create_attendance_window(self):
+        """Create the attendance window with a scrollable tile area and SAVE button."""
         attendance_window = tk.Toplevel(self.root)
-        attendance_window.title(class_name)
+        attendance_window.withdraw()  # Shown once its first grid is drawn
         attendance_window.geometry(f"{self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}")
         attendance_window.resizable(False, True)
-        
-        # Initialize attendance records
-        if class_name not in self.attendance_records:
-            self.attendance_records[class_name] = {}
+        attendance_window.protocol("WM_DELETE_WINDOW", self.close_attendance_screen)
         
         # Create scrollable container
         container = tk.Frame(attendance_window)
         container.pack(fill=tk.BOTH, expand=True)
         
-        # Student grid (tiles expand to fill available space)
-        self.create_student_grid(container, class_name)
+        # Student tiles are drawn on this canvas; one binding handles every tile
+        canvas = tk.Canvas(container, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.tag_bind("tile", "<Button-1>", self.on_tile_click)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
         
         # SAVE button at bottom
         save_btn = tk.Button(
@@ -179,29 +283,27 @@ class AttendanceSystem:
             height=2,
             relief="flat",
             bd=1,
-            command=lambda: self.save_attendance(class_name, attendance_window)
+            command=lambda: self.save_attendance(self.current_class)
         )
         save_btn.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
-        save_btn.bind("<ButtonPress-1>", self.animate_press)
-        save_btn.bind("<ButtonRelease-1>", self.animate_release)
-
-    def create_student_grid(self, container, class_name):
-        """Create a two-column grid of student tiles."""
-        canvas = tk.Canvas(container)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.add_press_animation(save_btn)
         
-        # Configure columns to expand fully
-        scrollable_frame.grid_columnconfigure(0, weight=1)
-        scrollable_frame.grid_columnconfigure(1, weight=1)
+        self.attendance_window = attendance_window
+        self.tile_canvas = canvas
+
+    def close_attendance_screen(self):
+        """Hide the attendance window and clear its tiles."""
+        self.clear_student_tiles()
+        self.attendance_window.withdraw()
+
+    def clear_student_tiles(self):
+        """Remove the drawn student tiles and scroll back to the top."""
+        self.tile_canvas.delete("tile")
+        self.tile_canvas.yview_moveto(0)
+
+    def create_student_grid(self, class_name):
+        """Draw a two-column grid of student tiles."""
+        import numpy as np
         
         # Get student data
         df = self.classes_data[class_name]['dataframe']
@@ -209,37 +311,54 @@ class AttendanceSystem:
         name_col = self.classes_data[class_name]['name_column']
         
         # Create student tiles in 2 columns
-        self.student_buttons[class_name] = {}
-        for index, row in df.iterrows():
-            student_id = str(row[roll_col])
-            grid_row = index // 2
-            grid_col = index % 2
-            
-            # Create student tile with a frame and button for a softer look
-            frame = tk.Frame(scrollable_frame, bd=1, relief="groove")
-            frame.grid(row=grid_row, column=grid_col, padx=5, pady=5, sticky="nsew")
+        canvas = self.tile_canvas
+        self.tile_rects = []
+        self.attendance_records[class_name] = np.zeros(len(df), dtype=bool)
+        
+        # Build every tile label up front so drawing only passes references
+        rolls = df[roll_col].to_numpy()
+        names = df[name_col].to_numpy()
+        labels = [f"{student_id}\n{name}" for student_id, name in zip(rolls, names)]
+        for index, label in enumerate(labels):
+            x = self.TILE_PADDING + (index % 2) * (self.TILE_WIDTH + self.TILE_PADDING)
+            y = self.TILE_PADDING + (index // 2) * (self.TILE_HEIGHT + self.TILE_PADDING)
             
-            button = tk.Button(
-                frame,
-                text=f"{student_id}\n{row[name_col]}",
-                width=15,
-                height=3,
-                bg=self.COLORS['absent'],
-                fg=self.COLORS['text_dark'],
+            # Rectangle and label share tags so a click on either hits the tile
+            tags = ("tile", f"row{index}")
+            rect = canvas.create_rectangle(
+                x, y, x + self.TILE_WIDTH, y + self.TILE_HEIGHT,
+                fill=self.COLORS['absent'],
+                outline="",
+                tags=tags
+            )
+            canvas.create_text(
+                x + self.TILE_WIDTH / 2, y + self.TILE_HEIGHT / 2,
+                text=label,
+                fill=self.COLORS['text_dark'],
                 font=('Roboto', 12),
-                relief="flat",
-                bd=1,
-                command=lambda sid=student_id: self.toggle_attendance(class_name, sid)
+                justify="center",
+                width=self.TILE_WIDTH - self.TILE_PADDING,
+                tags=tags
             )
-            button.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
-            button.bind("<ButtonPress-1>", self.animate_press)
-            button.bind("<ButtonRelease-1>", self.animate_release)
             
-            self.student_buttons[class_name][student_id] = button
-            self.attendance_records[class_name][student_id] = False
+            self.tile_rects.append(rect)
+        
+        rows = (len(df) + 1) // 2
+        canvas.configure(scrollregion=(
+            0, 0,
+            self.TILE_PADDING + 2 * (self.TILE_WIDTH + self.TILE_PADDING),
+            self.TILE_PADDING + rows * (self.TILE_HEIGHT + self.TILE_PADDING)
+        ))
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+    def on_tile_click(self, event):
+        """Toggle attendance for the tile under the cursor."""
+        tags = self.tile_canvas.gettags("current")
+        index = next(int(tag[3:]) for tag in tags if tag.startswith("row"))
+        self.toggle_attendance(self.current_class, index)
+
+    def add_press_animation(self, button):
+        """Attach the shared press/release animation bindings to a button."""
+        button.bindtags((self.ANIMATED_TAG,) + button.bindtags())
 
     def animate_press(self, event):
         """Simulate button press animation."""
@@ -249,53 +368,130 @@ class AttendanceSystem:
         """Simulate button release animation."""
         event.widget.config(relief="flat")
 
-    def toggle_attendance(self, class_name, student_id):
-        """Toggle student attendance status."""
-        current_status = self.attendance_records[class_name][student_id]
-        self.attendance_records[class_name][student_id] = not current_status
-        
-        # Update button color
-        button = self.student_buttons[class_name][student_id]
-        button.configure(
-            bg=self.COLORS['present'] if not current_status else self.COLORS['absent']
+    def toggle_attendance(self, class_name, index):
+        """Toggle attendance status of the student in the given row."""
+        records = self.attendance_records[class_name]
+        records[index] ^= True
+        
+        # Update tile color
+        self.tile_canvas.itemconfigure(
+            self.tile_rects[index],
+            fill=self.COLORS['present'] if records[index] else self.COLORS['absent']
         )
 
-    def save_attendance(self, class_name, attendance_window):
-        """Save attendance records to Excel file."""
+    def save_attendance(self, class_name):
+        """
+        Save attendance records to Excel file.
+        Returns: True if the attendance was saved
+        """
+        from datetime import datetime
+        import pandas as pd
+        
+        df = self.classes_data[class_name]['dataframe']
+        date = datetime.now().strftime("%d-%m-%y")
+        roll_col = self.classes_data[class_name]['roll_column']
+        name_col = self.classes_data[class_name]['name_column']
+        
+        # Snapshot only the columns we mutate so a failed save can be rolled back
+        prev_total = df["Total"].copy()
+        prev_today = df[date].copy() if date in df.columns else None
+        
         try:
-            df = self.classes_data[class_name]['dataframe'].copy()
-            date = datetime.now().strftime("%d-%m-%y")
-            roll_col = self.classes_data[class_name]['roll_column']
-            name_col = self.classes_data[class_name]['name_column']
-            
-            # Update attendance for today
-            attendance_list = []
-            for _, row in df.iterrows():
-                student_id = str(row[roll_col])
-                status = 'Present' if self.attendance_records[class_name].get(student_id, False) else 'Absent'
-                attendance_list.append(status)
-            
-            # Add today's attendance column
-            df[date] = attendance_list
+            # Add today's attendance column as int8 category codes (0 = Absent, 1 = Present)
+            status = pd.CategoricalDtype(['Absent', 'Present'])
+            df[date] = pd.Categorical.from_codes(self.attendance_records[class_name].astype("int8"), dtype=status)
             
             # Identify columns that contain attendance records.
             attendance_columns = [col for col in df.columns if col not in [roll_col, name_col, "Total"]]
             
             # Recalculate the "Total" column as the count of "Present" statuses in attendance columns
-            df["Total"] = df[attendance_columns].apply(lambda row: sum(1 for value in row if value == "Present"), axis=1)
+            # (categorical columns compare their codes rather than strings)
+            df["Total"] = (df[attendance_columns] == "Present").sum(axis=1).astype("int32")
             
             # Reorder columns so that "Total" always appears before any date columns
-            other_columns = [col for col in df.columns if col not in [roll_col, name_col, "Total"]]
-            df = df[[roll_col, name_col, "Total"] + other_columns]
+            self.order_columns(df, roll_col, name_col)
             
-            # Save updated DataFrame to Excel
-            df.to_excel(self.classes_data[class_name]['file_path'], index=False)
+            # Write only today's column and the totals when the sheet allows it,
+            # otherwise save the whole updated DataFrame to Excel
+            file_path = self.classes_data[class_name]['file_path']
+            if not self.append_attendance_column(file_path, df, date, roll_col):
+                self.write_workbook(file_path, df)
             
             messagebox.showinfo("Success", "Attendance saved!")
-            attendance_window.destroy()
+            self.close_attendance_screen()
+            return True
             
         except Exception as e:
+            df["Total"] = prev_total
+            if prev_today is None:
+                df.drop(columns=[date], inplace=True, errors="ignore")
+            else:
+                df[date] = prev_today
             messagebox.showerror("Error", f"Failed to save attendance: {str(e)}")
+            return False
+
+    def append_attendance_column(self, file_path, df, date, roll_col):
+        """
+        Write today's column and the updated totals into the existing workbook.
+        Returns False if the sheet cannot be updated in place and must be rewritten.
+        """
+        # openpyxl would drop the macros of .xlsm workbooks
+        if not file_path.lower().endswith(".xlsx"):
+            return False
+        
+        import openpyxl
+        import pandas as pd
+        
+        workbook = openpyxl.load_workbook(file_path)
+        sheet = workbook.worksheets[0]
+        headers = {str(cell.value): cell.column for cell in sheet[1] if cell.value is not None}
+        
+        if "Total" not in headers or str(roll_col) not in headers or sheet.max_row - 1 != len(df):
+            return False
+        
+        # Data under a blank header only gets a header when the sheet is rewritten
+        for cell in sheet[1]:
+            if cell.value is None and any(
+                value is not None
+                for (value,) in sheet.iter_rows(min_row=2, min_col=cell.column,
+                                                max_col=cell.column, values_only=True)
+            ):
+                return False
+        
+        # Rows are written by position, so the sheet must still list the same
+        # students in the same order as the loaded DataFrame
+        sheet_rolls = sheet.iter_rows(min_row=2, min_col=headers[str(roll_col)],
+                                      max_col=headers[str(roll_col)], values_only=True)
+        for (sheet_roll,), roll in zip(sheet_rolls, df[roll_col]):
+            if not (sheet_roll == roll or (sheet_roll is None and pd.isna(roll))):
+                return False
+        
+        total_col = headers["Total"]
+        date_col = headers.get(date, sheet.max_column + 1)
+        sheet.cell(row=1, column=date_col, value=date)
+        for row, (status, total) in enumerate(zip(df[date], df["Total"]), start=2):
+            sheet.cell(row=row, column=date_col, value=status)
+            sheet.cell(row=row, column=total_col, value=int(total))
+        
+        workbook.save(file_path)
+        return True
+
+    def write_workbook(self, file_path, df):
+        """Stream the DataFrame to the Excel file using openpyxl's write-only mode."""
+        # A write-only workbook is plain xlsx content; macro-enabled and legacy
+        # formats would end up with the wrong content under their extension
+        if not file_path.lower().endswith(".xlsx"):
+            raise ValueError("Attendance can only be saved to .xlsx files")
+        
+        import openpyxl
+        import pandas as pd
+        
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")  # Same sheet name as df.to_excel
+        sheet.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            sheet.append([None if pd.isna(value) else value for value in row])
+        workbook.save(file_path)
 
     def run(self):
         """Start the application."""